@@ -5,13 +5,19 @@ A web application for visualizing CSV data in 3D space with interactive controls
 """
 
 import os
+import io
+import asyncio
+import hashlib
+import tempfile
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
-from trame.app import get_server
+from trame.app import get_server, asynchronous
 from trame.ui.vuetify3 import SinglePageLayout
 from trame.widgets import vuetify3 as v3, vtk as vtk_widgets
 import vtk
 from vtk.util import numpy_support
+from vtk.numpy_interface import dataset_adapter as dsa
 
 # -----------------------------------------------------------------------------
 # Trame setup
@@ -34,6 +40,7 @@ state.available_material_ids = ["All"]
 state.data_loaded = False
 state.status_message = "No data loaded. Please upload a CSV file or load sample data."
 state.uploaded_files = []
+state.max_points = 500_000
 
 # VTK setup
 renderer = vtk.vtkRenderer()
@@ -46,147 +53,414 @@ render_window.SetSize(800, 600)
 render_window_interactor = vtk.vtkRenderWindowInteractor()
 render_window_interactor.SetRenderWindow(render_window)
 
+# Scene props - created once, create_3d_points only swaps their input data
+color_lut = vtk.vtkLookupTable()
+color_lut.SetNumberOfTableValues(256)
+color_lut.SetRange(0, 1)
+
+points_mapper = vtk.vtkPolyDataMapper()
+points_mapper.SetScalarModeToUsePointData()
+points_mapper.SetColorModeToDirectScalars()  # point colors are precomputed RGBA bytes
+
+points_actor = vtk.vtkActor()
+points_actor.SetMapper(points_mapper)
+points_actor.GetProperty().SetPointSize(8)
+
+axes_actor = vtk.vtkAxesActor()
+axes_actor.SetTotalLength(2, 2, 2)
+axes_actor.SetShaftTypeToCylinder()
+axes_actor.SetCylinderRadius(0.02)
+
+scalar_bar = vtk.vtkScalarBarActor()
+scalar_bar.SetLookupTable(color_lut)
+scalar_bar.SetNumberOfLabels(5)
+scalar_bar.SetPosition(0.85, 0.1)
+scalar_bar.SetWidth(0.1)
+scalar_bar.SetHeight(0.8)
+
+# Parsed uploads are kept as Parquet, keyed by the SHA-256 of the CSV bytes plus the
+# format version and parser. Bump CACHE_VERSION whenever load_csv_data changes what it
+# stores (dtypes, derived columns, categoricals) so older files are not reused.
+CACHE_DIR = "/tmp/trame_cache"
+CACHE_VERSION = 2
+CACHE_SIZE = 8  # most recently used files kept; older ones are deleted after each write
+
+# CSV parser: "pyarrow" (multithreaded, falls back to "c" on failure) or "c"
+CSV_ENGINE = os.environ.get("TRAME_CSV_ENGINE", "pyarrow")
+
+# Columns every uploaded CSV must have (Abs_Error is derived when absent)
+REQUIRED_COLUMNS = frozenset({'X (m)', 'Y (m)', 'Z (m)', 'Component ID', 'Material ID', 'True_Temp', 'Pred_Temp'})
+
+# Coordinates and colors are parsed straight to single precision - plenty for display,
+# and half the bytes of float64 when copied to VTK
+CSV_DTYPES = {col: 'float32' for col in ['X (m)', 'Y (m)', 'Z (m)', 'True_Temp', 'Pred_Temp', 'Abs_Error']}
+
+# Row indices per Component ID / Material ID for the loaded dataset
+_row_groups = {}
+
+# Normalized color arrays and their (min, max) for the full loaded dataset
+COLOR_MODES = ['True_Temp', 'Pred_Temp', 'Abs_Error']
+_color_cache = {}
+
+# Point polydata and color range per (component, material, color mode, effective point budget), cleared when a new dataset loads
+VIZ_CACHE_SIZE = 16
+_viz_cache = OrderedDict()
+
+# Results of load_csv_data per uploaded content, so a re-fired upload isn't parsed again.
+# Each entry is a full DataFrame; older uploads fall back to the Parquet cache.
+INGEST_CACHE_SIZE = 2
+_ingest_cache = OrderedDict()
+
+# Selection changes closer together than this (seconds) are redrawn once
+RENDER_DEBOUNCE = 0.05
+_pending_render = None
+
 # -----------------------------------------------------------------------------
 # Helper functions
 # -----------------------------------------------------------------------------
 
-def load_csv_data(file_path):
-    """Load and process CSV data"""
+def file_digest(file_path):
+    """SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def cache_path_for(digest):
+    """Location of the Parquet copy of the CSV with the given digest"""
+    return os.path.join(CACHE_DIR, f"{digest}-v{CACHE_VERSION}-{CSV_ENGINE}.parquet")
+
+def prune_cache():
+    """Delete all but the CACHE_SIZE most recently used Parquet files (by mtime)"""
+    entries = [e for e in os.scandir(CACHE_DIR) if e.name.endswith('.parquet')]
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in entries[CACHE_SIZE:]:
+        try:
+            os.remove(entry.path)
+        except OSError as e:
+            print(f"Could not remove cache file {entry.path}: {e}")
+
+def write_cache_file(df, cache_path):
+    """Write df to cache_path atomically, so other processes never see a partial file"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+    os.close(fd)
     try:
-        df = pd.read_csv(file_path)
-        
-        # Print actual column names for debugging
-        print(f"Actual CSV columns: {list(df.columns)}")
+        df.to_parquet(temp_path, engine='pyarrow')
+        os.replace(temp_path, cache_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+def read_csv(source):
+    """Parse a CSV file path or raw CSV bytes with the configured engine"""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    if CSV_ENGINE == "pyarrow":
+        try:
+            return pd.read_csv(source, engine='pyarrow', dtype=CSV_DTYPES)
+        except Exception as e:
+            print(f"pyarrow CSV engine failed, falling back to default parser: {e}")
+            if hasattr(source, 'seek'):
+                source.seek(0)
+    return pd.read_csv(source, dtype=CSV_DTYPES)
+
+def abs_error(df):
+    """|True_Temp - Pred_Temp| in a single pass, using numexpr when it is installed"""
+    true_temp = df['True_Temp'].to_numpy()
+    pred_temp = df['Pred_Temp'].to_numpy()
+    try:
+        import numexpr
+    except ImportError:
+        return np.abs(true_temp - pred_temp)
+    return numexpr.evaluate("abs(t - p)", local_dict={'t': true_temp, 'p': pred_temp})
+
+def load_csv_data(source, digest=None):
+    """Load and process CSV data from a file path or raw CSV bytes"""
+    try:
+        if digest is None:
+            if isinstance(source, (bytes, bytearray)):
+                digest = hashlib.sha256(source).hexdigest()
+            else:
+                digest = file_digest(source)
+        cache_path = cache_path_for(digest)
+        df = None
         
-        # Validate required columns - updated to match your exact column names
-        required_cols = ['X (m)', 'Y (m)', 'Z (m)', 'Component ID', 'Material ID', 'True_Temp', 'Pred_Temp', 'Abs_Error']
-        missing_cols = [col for col in required_cols if col not in df.columns]
+        # Reuse the Parquet copy from a previous load of the same bytes
+        if os.path.exists(cache_path):
+            try:
+                df = pd.read_parquet(cache_path, engine='pyarrow')
+                os.utime(cache_path)  # mark as recently used so prune_cache keeps it
+            except Exception as e:
+                print(f"Ignoring unreadable cache file {cache_path}: {e}")
         
-        if missing_cols:
-            return None, f"Missing required columns: {', '.join(missing_cols)}"
+        if df is None:
+            df = read_csv(source)
+            
+            # Print actual column names for debugging
+            print(f"Actual CSV columns: {list(df.columns)}")
+            
+            # Validate required columns
+            missing_cols = REQUIRED_COLUMNS.difference(df.columns)
+            
+            if missing_cols:
+                return None, f"Missing required columns: {', '.join(sorted(missing_cols))}"
             
-        # Get unique values for dropdowns
-        component_ids = sorted(df['Component ID'].unique().tolist())
-        material_ids = sorted(df['Material ID'].unique().tolist())
+            # Abs_Error is optional in the CSV since it can be derived from the temperatures
+            if 'Abs_Error' not in df.columns:
+                df['Abs_Error'] = abs_error(df)
+            
+            # Categorical IDs: categories are already sorted unique values for the dropdowns
+            df['Component ID'] = df['Component ID'].astype('category')
+            df['Material ID'] = df['Material ID'].astype('category')
+            
+            try:
+                write_cache_file(df, cache_path)
+                prune_cache()
+            except Exception as e:
+                print(f"Could not write cache file {cache_path}: {e}")
+        
+        component_ids = df['Component ID'].cat.categories.tolist()
+        material_ids = df['Material ID'].cat.categories.tolist()
         
         return df, component_ids, material_ids, "Data loaded successfully!"
     except Exception as e:
         return None, f"Error loading CSV: {str(e)}"
 
+def ingest(content):
+    """Load uploaded CSV bytes, reusing the result of an earlier ingest of the same bytes"""
+    # One hash serves as both the in-memory key and the Parquet cache key
+    digest = hashlib.sha256(content).hexdigest()
+    if digest in _ingest_cache:
+        _ingest_cache.move_to_end(digest)
+        return _ingest_cache[digest]
+    
+    result = load_csv_data(content, digest)
+    if len(result) == 4:  # Only successful loads are worth keeping
+        _ingest_cache[digest] = result
+        if len(_ingest_cache) > INGEST_CACHE_SIZE:
+            _ingest_cache.popitem(last=False)
+    return result
+
+def index_dataset(df):
+    """Rebuild the per-dataset lookups used while filtering and coloring df"""
+    # Cache row indices per ID so filtering doesn't rescan the whole frame
+    _row_groups['Component ID'] = df.groupby('Component ID', observed=True).indices
+    _row_groups['Material ID'] = df.groupby('Material ID', observed=True).indices
+    _viz_cache.clear()
+    
+    # Color normalization never changes for the unfiltered dataset, so do it once
+    _color_cache.clear()
+    for mode in COLOR_MODES:
+        _color_cache[mode] = normalize_values(df[mode])
+
+def apply_dataset(df, component_ids, material_ids, status_message):
+    """Make df the displayed dataset and reset the selections"""
+    # The same upload can arrive through both the watcher and the controller,
+    # in which case the lookups (and cached polydata) are still valid
+    if df is not state.csv_data:
+        index_dataset(df)
+    state.csv_data = df
+    state.available_component_ids = ["All"] + component_ids
+    state.available_material_ids = ["All"] + material_ids
+    state.current_component_id = "All"
+    state.current_material_id = "All"
+    state.data_loaded = True
+    state.status_message = status_message
+    
+    print(f"Data loaded successfully: {len(df)} rows")  # Debug logging
+    
+    # Update visualization
+    filtered_df = filter_data()
+    create_3d_points(filtered_df, state.color_mode, reset_camera=True)
+    
+    state.dirty("available_component_ids", "available_material_ids", "data_loaded", "status_message")
+
+def normalize_values(series):
+    """Scale a column to the 0-1 range as float32, returning (values, min, max)"""
+    values = series.to_numpy(dtype=np.float32, copy=True)
+    min_val, max_val = float(values.min()), float(values.max())
+    if max_val > min_val:
+        values -= min_val
+        values *= 1.0 / (max_val - min_val)
+    else:
+        values.fill(0.0)
+    return values, min_val, max_val
+
 def get_color_array(df, color_mode):
     """Get color array based on selected mode"""
+    # Filtering keeps row order, so a frame as long as the dataset is the whole dataset
+    if color_mode in _color_cache and state.csv_data is not None and len(df) == len(state.csv_data):
+        return _color_cache[color_mode]
     if color_mode in df.columns:
-        values = df[color_mode].values
-        # Normalize values to 0-1 range for color mapping
-        min_val, max_val = values.min(), values.max()
-        if max_val > min_val:
-            normalized = (values - min_val) / (max_val - min_val)
-        else:
-            normalized = np.zeros_like(values)
-        return normalized, min_val, max_val
-    return np.zeros(len(df)), 0, 1
-
-def create_3d_points(df, color_mode):
-    """Create VTK points for 3D visualization"""
-    # Clear previous actors
-    renderer.RemoveAllViewProps()
+        return normalize_values(df[color_mode])
+    return np.zeros(len(df), dtype=np.float32), 0, 1
+
+def apply_color_scheme(color_mode):
+    """Set the lookup table's colors for color_mode"""
+    # Different color schemes for different modes
+    if color_mode == "True_Temp":
+        color_lut.SetHueRange(0.667, 0.0)  # Blue to Red
+    elif color_mode == "Pred_Temp":
+        color_lut.SetHueRange(0.333, 0.0)  # Green to Red
+    else:  # Abs_Error
+        color_lut.SetHueRange(0.0, 0.667)  # Red to Blue
+    color_lut.Build()
+
+def voxel_pick(xyz, lo, cell_size):
+    """Row indices of the first point in each occupied cubic cell of side cell_size"""
+    cells = ((xyz - lo) / cell_size).astype(np.int64)
+    dims = [int(d) + 1 for d in cells.max(axis=0)]
+    if dims[0] * dims[1] * dims[2] <= np.iinfo(np.int64).max:
+        # Fast path: one int64 key per point
+        keys = np.ravel_multi_index(cells.T, dims)
+        _, keep = np.unique(keys, return_index=True)
+    else:
+        # Grid too fine for flat int64 keys - sort the coordinate triples instead
+        _, keep = np.unique(cells, axis=0, return_index=True)
+    return keep
+
+def voxel_downsample(xyz, max_points, passes=8):
+    """Row indices of at most max_points points, one per occupied voxel"""
+    lo = xyz.min(axis=0).astype(np.float64)
+    largest = float((xyz.max(axis=0) - lo).max())
+    if largest == 0:  # every point is the same point
+        return np.zeros(1, dtype=np.intp)
     
+    # Cells as large as the bounding box keep at most 8 points; cells a max_points-th
+    # of it usually keep too many. Bisect (geometrically) on the number actually kept,
+    # so thin or hollow data still lands just under the budget.
+    large, small = largest, largest / max_points
+    best = voxel_pick(xyz, lo, large)
+    keep = voxel_pick(xyz, lo, small)
+    if len(keep) <= max_points:
+        best = keep
+    else:
+        for _ in range(passes):
+            mid = (large * small) ** 0.5
+            keep = voxel_pick(xyz, lo, mid)
+            if len(keep) <= max_points:
+                large, best = mid, keep
+            else:
+                small = mid
+    
+    best.sort()
+    return best
+
+def build_polydata(df, color_mode, max_points):
+    """Build the point polydata for df, returning (polydata, min, max) of the color values"""
+    xyz = df[['X (m)', 'Y (m)', 'Z (m)']].to_numpy(dtype=np.float32, copy=False)
+    colors, min_val, max_val = get_color_array(df, color_mode)
+    
+    # Thin out huge selections to one point per voxel, keeping the full color range
+    if len(xyz) > max_points:
+        keep = voxel_downsample(xyz, max_points)
+        xyz, colors = xyz[keep], colors[keep]
+    
+    # Map colors to RGBA bytes once here rather than through the LUT on every render
+    apply_color_scheme(color_mode)
+    n_colors = color_lut.GetNumberOfTableValues()
+    table = numpy_support.vtk_to_numpy(color_lut.GetTable())[:n_colors]  # drop NaN/out-of-range entries
+    rgba = table[np.minimum((colors * n_colors).astype(np.intp), n_colors - 1)]
+    
+    # Create polydata - points only; the adapter wraps the NumPy buffers without copying
+    polydata = vtk.vtkPolyData()
+    wrapped = dsa.WrapDataObject(polydata)
+    wrapped.Points = np.ascontiguousarray(xyz)
+    wrapped.PointData.append(rgba, "RGBA")
+    wrapped.PointData.SetActiveScalars("RGBA")
+    
+    # Create vertex cells in C++ - the local view's serializer needs a plain polydata mapper
+    glyph = vtk.vtkVertexGlyphFilter()
+    glyph.SetInputData(polydata)
+    glyph.Update()
+    
+    return glyph.GetOutput(), min_val, max_val
+
+def create_3d_points(df, color_mode, reset_camera=False):
+    """Show df in the 3D view, colored by color_mode"""
     if df is None or df.empty:
+        # Hide only the points; axes and scalar bar stay, and the camera is left alone
+        points_actor.SetVisibility(False)
+        render_window.Render()
+        ctrl.view_update()
         state.status_message = "No data to display after filtering."
         return
     
     try:
-        # Create points - using correct column names
-        points = vtk.vtkPoints()
-        for _, row in df.iterrows():
-            points.InsertNextPoint(float(row['X (m)']), float(row['Y (m)']), float(row['Z (m)']))
-        
-        # Create polydata
-        polydata = vtk.vtkPolyData()
-        polydata.SetPoints(points)
-        
-        # Create vertices
-        vertices = vtk.vtkCellArray()
-        for i in range(points.GetNumberOfPoints()):
-            vertices.InsertNextCell(1, [i])
-        polydata.SetVerts(vertices)
-        
-        # Add color data
-        colors, min_val, max_val = get_color_array(df, color_mode)
-        color_array = numpy_support.numpy_to_vtk(colors)
-        color_array.SetName("colors")
-        polydata.GetPointData().SetScalars(color_array)
-        
-        # Create mapper
-        mapper = vtk.vtkPolyDataMapper()
-        mapper.SetInputData(polydata)
-        mapper.SetScalarRange(0, 1)
-        
-        # Create actor
-        actor = vtk.vtkActor()
-        actor.SetMapper(mapper)
-        actor.GetProperty().SetPointSize(8)
-        
-        # Set color map
-        lut = vtk.vtkLookupTable()
-        lut.SetNumberOfTableValues(256)
-        lut.SetRange(0, 1)
-        
-        # Different color schemes for different modes
-        if color_mode == "True_Temp":
-            lut.SetHueRange(0.667, 0.0)  # Blue to Red
-        elif color_mode == "Pred_Temp":
-            lut.SetHueRange(0.333, 0.0)  # Green to Red
-        else:  # Abs_Error
-            lut.SetHueRange(0.0, 0.667)  # Red to Blue
-        
-        lut.Build()
-        mapper.SetLookupTable(lut)
-        
-        # Add actor to renderer
-        renderer.AddActor(actor)
+        # Reuse the polydata built the last time this selection was shown
+        # Any budget at or above the selection size yields the same, undownsampled polydata
+        cache_key = (state.current_component_id, state.current_material_id, color_mode, min(state.max_points, len(df)))
+        if cache_key in _viz_cache:
+            _viz_cache.move_to_end(cache_key)
+        else:
+            _viz_cache[cache_key] = build_polydata(df, color_mode, state.max_points)
+            if len(_viz_cache) > VIZ_CACHE_SIZE:
+                _viz_cache.popitem(last=False)
+        polydata, min_val, max_val = _viz_cache[cache_key]
         
-        # Add axes
-        axes = vtk.vtkAxesActor()
-        axes.SetTotalLength(2, 2, 2)
-        axes.SetShaftTypeToCylinder()
-        axes.SetCylinderRadius(0.02)
-        renderer.AddActor(axes)
+        points_mapper.SetInputData(polydata)
+        points_actor.SetVisibility(True)
         
-        # Add a color bar
-        scalar_bar = vtk.vtkScalarBarActor()
-        scalar_bar.SetLookupTable(lut)
+        # The scalar bar still reads its colors from the LUT
+        apply_color_scheme(color_mode)
         scalar_bar.SetTitle(f"{color_mode}\n({min_val:.2f} - {max_val:.2f})")
-        scalar_bar.SetNumberOfLabels(5)
-        scalar_bar.SetPosition(0.85, 0.1)
-        scalar_bar.SetWidth(0.1)
-        scalar_bar.SetHeight(0.8)
-        renderer.AddActor(scalar_bar)
         
-        # Reset camera
-        renderer.ResetCamera()
+        # Props stay in the renderer once added
+        if not renderer.HasViewProp(points_actor):
+            renderer.AddActor(points_actor)
+            renderer.AddActor(axes_actor)
+            renderer.AddActor(scalar_bar)
+            reset_camera = True
+        
+        if reset_camera:
+            renderer.ResetCamera()
         render_window.Render()
+        ctrl.view_update()
         
-        state.status_message = f"Displaying {len(df)} points colored by {color_mode}"
+        shown = polydata.GetNumberOfPoints()
+        if shown < len(df):
+            state.status_message = f"Displaying {shown} of {len(df)} points colored by {color_mode}"
+        else:
+            state.status_message = f"Displaying {len(df)} points colored by {color_mode}"
         
     except Exception as e:
         state.status_message = f"Error creating visualization: {str(e)}"
 
 def filter_data():
-    """Filter data based on current selections"""
+    """Filter data based on current selections (read-only, may share the loaded frame)"""
     if state.csv_data is None:
         return None
     
-    df = state.csv_data.copy()
+    df = state.csv_data
+    rows = None
     
     if state.current_component_id and state.current_component_id != "All":
-        df = df[df['Component ID'] == state.current_component_id]
+        rows = _row_groups['Component ID'].get(state.current_component_id, np.empty(0, dtype=np.intp))
     
     if state.current_material_id and state.current_material_id != "All":
-        df = df[df['Material ID'] == state.current_material_id]
+        material_rows = _row_groups['Material ID'].get(state.current_material_id, np.empty(0, dtype=np.intp))
+        rows = material_rows if rows is None else np.intersect1d(rows, material_rows, assume_unique=True)
+    
+    if rows is not None:
+        df = df.iloc[rows]
     
     return df
 
+async def _render_after_debounce():
+    await asyncio.sleep(RENDER_DEBOUNCE)
+    with state:
+        filtered_df = filter_data()
+        create_3d_points(filtered_df, state.color_mode)
+
+def schedule_render():
+    """Redraw for the current selection once it has stopped changing"""
+    global _pending_render
+    if _pending_render is not None:
+        _pending_render.cancel()
+    _pending_render = asynchronous.create_task(_render_after_debounce())
+
 # -----------------------------------------------------------------------------
 # State watchers
 # -----------------------------------------------------------------------------
@@ -194,25 +468,27 @@ def filter_data():
 @state.change("uploaded_files")
 def on_uploaded_files_change(uploaded_files, **kwargs):
     """Watch for changes in uploaded_files state and trigger file processing"""
-    print(f"uploaded_files changed: {uploaded_files}")  # Debug logging
-    print(f"uploaded_files type: {type(uploaded_files)}")  # Debug logging
-    
-    if not uploaded_files:
-        return
-    
-    # Handle different formats that Trame might provide
-    try:
-        # Check if it's a list and has items
-        if isinstance(uploaded_files, list) and len(uploaded_files) > 0:
-            # Handle each file in the list
-            for file_item in uploaded_files:
-                process_single_file(file_item)
-        elif uploaded_files is not None:  # Handle single file case - fixed to avoid DataFrame ambiguity
-            process_single_file(uploaded_files)
-    except Exception as e:
-        print(f"Error in uploaded_files_change: {e}")
-        state.status_message = f"Error processing uploaded file: {str(e)}"
-        state.dirty("status_message")
+    # Batch all state changes into a single push to the client
+    with state:
+        print(f"uploaded_files changed: {uploaded_files}")  # Debug logging
+        print(f"uploaded_files type: {type(uploaded_files)}")  # Debug logging
+        
+        if not uploaded_files:
+            return
+        
+        # Handle different formats that Trame might provide
+        try:
+            # Check if it's a list and has items
+            if isinstance(uploaded_files, list) and len(uploaded_files) > 0:
+                # Handle each file in the list
+                for file_item in uploaded_files:
+                    process_single_file(file_item)
+            elif uploaded_files is not None:  # Handle single file case - fixed to avoid DataFrame ambiguity
+                process_single_file(uploaded_files)
+        except Exception as e:
+            print(f"Error in uploaded_files_change: {e}")
+            state.status_message = f"Error processing uploaded file: {str(e)}"
+            state.dirty("status_message")
 
 def process_single_file(file_item):
     """Process a single uploaded file"""
@@ -257,37 +533,13 @@ def process_single_file(file_item):
         if isinstance(content, str):
             content = content.encode('utf-8')
         
-        # Save uploaded file temporarily
-        temp_path = "/tmp/uploaded_data.csv"
-        with open(temp_path, 'wb') as f:
-            f.write(content)
-        
-        print(f"File saved to: {temp_path}")  # Debug logging
-        
-        # Load and process the data
-        result = load_csv_data(temp_path)
+        # Load and process the data straight from memory
+        result = ingest(content)
         print(f"Load result: {result}")  # Debug logging
         
         if len(result) == 4:  # Success case
             df, component_ids, material_ids, message = result
-            state.csv_data = df
-            state.available_component_ids = ["All"] + component_ids
-            state.available_material_ids = ["All"] + material_ids
-            state.current_component_id = "All"
-            state.current_material_id = "All"
-            state.data_loaded = True
-            state.status_message = f"{message} - {len(df)} rows loaded."
-            
-            print(f"Data loaded successfully: {len(df)} rows")  # Debug logging
-            
-            # Update visualization
-            filtered_df = filter_data()
-            create_3d_points(filtered_df, state.color_mode)
-            
-            # Force UI update
-            ctrl.view_update()
-            
-            state.dirty("available_component_ids", "available_material_ids", "data_loaded", "status_message")
+            apply_dataset(df, component_ids, material_ids, f"{message} - {len(df)} rows loaded.")
         else:
             error_msg = result[1] if len(result) > 1 else "Unknown error"
             state.status_message = f"Error: {error_msg}"
@@ -300,6 +552,12 @@ def process_single_file(file_item):
         state.dirty("status_message", "data_loaded")
         print(f"Exception in file processing: {e}")  # Debug logging
 
+@state.change("max_points")
+def on_max_points_change(max_points, **kwargs):
+    """Redraw with the new point budget"""
+    if state.data_loaded:
+        schedule_render()
+
 # -----------------------------------------------------------------------------
 # Controller functions
 # -----------------------------------------------------------------------------
@@ -307,125 +565,46 @@ def process_single_file(file_item):
 @ctrl.add("on_file_change")
 def on_file_change(files):
     """Handle file upload"""
-    print(f"File upload triggered with files: {files}")  # Debug logging
-    
-    if not files or len(files) == 0:
-        state.status_message = "No file selected."
-        state.dirty("status_message")
-        return
+    # Batch all state changes into a single push to the client
+    with state:
+        print(f"File upload triggered with files: {files}")  # Debug logging
         
-    file_info = files[0]
-    print(f"File info: {file_info}")  # Debug logging
-    
-    # Handle different file input formats
-    content = None
-    if 'content' in file_info:
-        content = file_info['content']
-    elif 'file' in file_info and hasattr(file_info['file'], 'read'):
-        content = file_info['file'].read()
-    elif isinstance(file_info, dict) and 'name' in file_info:
-        # Handle file path case
-        try:
-            with open(file_info['name'], 'rb') as f:
-                content = f.read()
-        except Exception as e:
-            state.status_message = f"Error reading file: {str(e)}"
+        if not files or len(files) == 0:
+            state.status_message = "No file selected."
             state.dirty("status_message")
             return
-    
-    if content is None:
-        state.status_message = "Could not read file content."
-        state.dirty("status_message")
-        return
-    
-    try:
-        # Save uploaded file temporarily
-        temp_path = "/tmp/uploaded_data.csv"
-        with open(temp_path, 'wb') as f:
-            f.write(content)
-        
-        print(f"File saved to: {temp_path}")  # Debug logging
-        
-        # Load and process the data
-        result = load_csv_data(temp_path)
-        print(f"Load result: {result}")  # Debug logging
-        
-        if len(result) == 4:  # Success case
-            df, component_ids, material_ids, message = result
-            state.csv_data = df
-            state.available_component_ids = ["All"] + component_ids
-            state.available_material_ids = ["All"] + material_ids
-            state.current_component_id = "All"
-            state.current_material_id = "All"
-            state.data_loaded = True
-            state.status_message = f"{message} - {len(df)} rows loaded."
-            
-            print(f"Data loaded successfully: {len(df)} rows")  # Debug logging
-            
-            # Update visualization
-            filtered_df = filter_data()
-            create_3d_points(filtered_df, state.color_mode)
             
-            # Force UI update
-            ctrl.view_update()
-            
-            state.dirty("available_component_ids", "available_material_ids", "data_loaded", "status_message")
-        else:
-            error_msg = result[1] if len(result) > 1 else "Unknown error"
-            state.status_message = f"Error: {error_msg}"
-            state.data_loaded = False
-            state.dirty("status_message", "data_loaded")
-            
-    except Exception as e:
-        state.status_message = f"Error processing file: {str(e)}"
-        state.data_loaded = False
-        state.dirty("status_message", "data_loaded")
-        print(f"Exception in file upload: {e}")  # Debug logging
+        process_single_file(files[0])
 
 @ctrl.add("on_component_change")
 def on_component_change():
     """Handle component ID selection change"""
-    filtered_df = filter_data()
-    create_3d_points(filtered_df, state.color_mode)
-    state.dirty("status_message")
+    schedule_render()
 
 @ctrl.add("on_material_change") 
 def on_material_change():
     """Handle material ID selection change"""
-    filtered_df = filter_data()
-    create_3d_points(filtered_df, state.color_mode)
-    state.dirty("status_message")
+    schedule_render()
 
 @ctrl.add("on_color_mode_change")
 def on_color_mode_change():
     """Handle color mode change"""
-    filtered_df = filter_data()
-    create_3d_points(filtered_df, state.color_mode)
-    state.dirty("status_message")
+    schedule_render()
 
 @ctrl.add("load_sample_data")
 def load_sample_data():
     """Load sample data from sample_3d_data.csv"""
-    sample_path = os.path.join(os.path.dirname(__file__), "sample_3d_data.csv")
-    if os.path.exists(sample_path):
-        result = load_csv_data(sample_path)
-        if len(result) == 4:  # Success case
-            df, component_ids, material_ids, message = result
-            state.csv_data = df
-            state.available_component_ids = ["All"] + component_ids
-            state.available_material_ids = ["All"] + material_ids
-            state.current_component_id = "All"
-            state.current_material_id = "All"
-            state.data_loaded = True
-            state.status_message = f"Sample data loaded: {message}"
-            
-            # Update visualization
-            filtered_df = filter_data()
-            create_3d_points(filtered_df, state.color_mode)
-            state.dirty("available_component_ids", "available_material_ids", "data_loaded", "status_message")
-    else:
-        state.status_message = "Sample data file not found."
-        state.dirty("status_message")
+    # Batch all state changes into a single push to the client
+    with state:
+        sample_path = os.path.join(os.path.dirname(__file__), "sample_3d_data.csv")
+        if os.path.exists(sample_path):
+            result = load_csv_data(sample_path)
+            if len(result) == 4:  # Success case
+                df, component_ids, material_ids, message = result
+                apply_dataset(df, component_ids, material_ids, f"Sample data loaded: {message}")
+        else:
+            state.status_message = "Sample data file not found."
+            state.dirty("status_message")
 
 # -----------------------------------------------------------------------------
 # UI Layout
@@ -508,12 +687,25 @@ def create_layout():
                                 v3.VSelect(
                                     label="Color Mode",
                                     v_model=("color_mode",),
-                                    items=['True_Temp', 'Pred_Temp', 'Abs_Error'],
+                                    items=COLOR_MODES,
                                     variant="outlined", 
                                     density="compact",
                                     change="on_color_mode_change",
                                     disabled=("!data_loaded",)
                                 )
+                                
+                                # Point budget - larger selections are voxel-downsampled
+                                v3.VSlider(
+                                    label="Max Points",
+                                    v_model=("max_points",),
+                                    min=100_000,
+                                    max=2_000_000,
+                                    step=100_000,
+                                    thumb_label=True,
+                                    density="compact",
+                                    style="margin-top: 16px;",
+                                    disabled=("!data_loaded",)
+                                )
                     
                     # 3D Visualization
                     with v3.VCol(cols=12, md=9):
@@ -529,10 +721,12 @@ def create_layout():
                                 )
                             
                             with v3.VCardText(style="height: calc(100% - 64px); padding: 8px;"):
-                                vtk_widgets.VtkRemoteView(
+                                # Geometry is sent once and rendered by WebGL in the browser
+                                view = vtk_widgets.VtkLocalView(
                                     render_window,
                                     style="height: 100%; width: 100%; border-radius: 4px;"
                                 )
+                                ctrl.view_update = view.update
 
 # -----------------------------------------------------------------------------
 # Main execution